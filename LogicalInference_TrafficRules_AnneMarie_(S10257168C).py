@@ -1,17 +1,31 @@
+import functools
 import itertools
+import operator
+import sys
+import weakref
+from types import MappingProxyType
+
+# Opcodes for compiled sentence programs
+LOAD, NOT, AND_N, OR_N = range(4)
 
 class Sentence():
+    __slots__ = ()
+
     def evaluate(self, model):
         """Evaluates the logical sentence."""
         raise Exception("nothing to evaluate")
 
+    def compile(self, symbol_index):
+        """Compiles the sentence to a flat list of opcodes."""
+        raise Exception("nothing to compile")
+
     def formula(self):
         """Returns string formula representing logical sentence."""
         return ""
 
     def symbols(self):
         """Returns a set of all symbols in the logical sentence."""
-        return set()
+        return frozenset()
 
     @classmethod
     def validate(cls, sentence):
@@ -21,59 +35,114 @@ class Sentence():
     @classmethod
     def parenthesize(cls, s):
         """Parenthesizes an expression if not already parenthesized."""
-        def balanced(s):
-            """Checks if a string has balanced parentheses."""
-            count = 0
-            for c in s:
-                if c == "(":
-                    count += 1
-                elif c == ")":
-                    if count <= 0:
-                        return False
-                    count -= 1
-            return count == 0
-        if not len(s) or s.isalpha() or (
-            s[0] == "(" and s[-1] == ")" and balanced(s[1:-1])
-        ):
-            return s
-        else:
-            return f"({s})"
+        return _parenthesize(s)
+
+def _balanced(s):
+    """Checks if a string has balanced parentheses."""
+    opens = s.count("(")
+    if opens != s.count(")"):
+        return False
+    if not opens:
+        return True
+
+    # Counts match, so only a prefix dipping below zero can unbalance it
+    count = 0
+    for c in s.encode("ascii", "ignore"):
+        if c == 40:  # "("
+            count += 1
+        elif c == 41:  # ")"
+            if count <= 0:
+                return False
+            count -= 1
+    return True
+
+@functools.lru_cache(maxsize=1024)
+def _parenthesize(s):
+    if not len(s) or s.isalpha() or (
+        s[0] == "(" and s[-1] == ")" and _balanced(s[1:-1])
+    ):
+        return s
+    else:
+        return f"({s})"
 
 class Symbol(Sentence):
-    def __init__(self, name):
-        self.name = name
+    __slots__ = ("name", "_hash", "_symbols")
+
+    # Interned instances, so equal names share one object
+    _intern = {}
+
+    def __new__(cls, name):
+        symbol = cls._intern.get(name)
+        if symbol is None:
+            symbol = super().__new__(cls)
+            symbol.name = name
+            symbol._hash = hash(("symbol", name))
+            symbol._symbols = frozenset((name,))
+            cls._intern[name] = symbol
+        return symbol
+
+    def __reduce__(self):
+        # Rebuild from the name alone; the cached hash is only valid in the
+        # process that computed it
+        return (self.__class__, (self.name,))
+
+    @classmethod
+    def get(cls, name):
+        """Returns the shared symbol with the given name."""
+        return cls(name)
 
     def __eq__(self, other):
-        return isinstance(other, Symbol) and self.name == other.name
+        return self is other
 
     def __hash__(self):
-        return hash(("symbol", self.name))
+        return self._hash
 
     def __repr__(self):
         return self.name
 
     def evaluate(self, model):
-        try:
-            return bool(model[self.name])
-        except KeyError:
-            raise Exception(f"variable {self.name} not in model")
+        # Model values are bools; symbols missing from it count as False
+        return model.get(self.name, False)
+
+    def compile(self, symbol_index):
+        # A symbol without a bit never appears in a model, so it loads
+        # False, matching evaluate
+        return [(LOAD, symbol_index.get(self.name, 0))]
 
     def formula(self):
         return self.name
 
     def symbols(self):
-        return {self.name}
+        return self._symbols
 
 class Not(Sentence):
-    def __init__(self, operand):
+    __slots__ = ("operand", "_hash", "_formula", "_symbols", "__weakref__")
+
+    # Interned instances keyed on the operand; held weakly so negations
+    # nobody references any more are dropped
+    _intern = weakref.WeakValueDictionary()
+
+    def __new__(cls, operand):
         Sentence.validate(operand)
-        self.operand = operand
+        negation = cls._intern.get(operand)
+        if negation is None:
+            negation = super().__new__(cls)
+            negation.operand = operand
+            negation._hash = hash(("not", hash(operand)))
+            negation._formula = negation._symbols = None
+            cls._intern[operand] = negation
+        return negation
+
+    def __reduce__(self):
+        return (self.__class__, (self.operand,))
 
     def __eq__(self, other):
-        return isinstance(other, Not) and self.operand == other.operand
+        return self is other or (
+            isinstance(other, Not) and self.operand == other.operand
+        )
 
     def __hash__(self):
-        return hash(("not", hash(self.operand)))
+        return self._hash
 
     def __repr__(self):
         return f"Not({self.operand})"
@@ -81,25 +150,39 @@ class Not(Sentence):
     def evaluate(self, model):
         return not self.operand.evaluate(model)
 
+    def compile(self, symbol_index):
+        return self.operand.compile(symbol_index) + [(NOT,)]
+
     def formula(self):
-        return "¬" + Sentence.parenthesize(self.operand.formula())
+        if self._formula is None:
+            self._formula = "¬" + Sentence.parenthesize(self.operand.formula())
+        return self._formula
 
     def symbols(self):
-        return self.operand.symbols()
+        if self._symbols is None:
+            self._symbols = self.operand.symbols()
+        return self._symbols
 
 class And(Sentence):
+    __slots__ = ("conjuncts", "_hash", "_formula", "_symbols")
+
     def __init__(self, *conjuncts):
         for conjunct in conjuncts:
             Sentence.validate(conjunct)
-        self.conjuncts = list(conjuncts)
+        self.conjuncts = conjuncts
+        self._hash = hash(
+            ("and", tuple(hash(conjunct) for conjunct in conjuncts))
+        )
+        self._formula = self._symbols = None
 
     def __eq__(self, other):
         return isinstance(other, And) and self.conjuncts == other.conjuncts
 
     def __hash__(self):
-        return hash(
-            ("and", tuple(hash(conjunct) for conjunct in self.conjuncts))
-        )
+        return self._hash
+
+    def __reduce__(self):
+        return (self.__class__, self.conjuncts)
 
     def __repr__(self):
         conjunctions = ", ".join(
@@ -108,27 +191,50 @@ class And(Sentence):
         return f"And({conjunctions})"
 
     def add(self, conjunct):
-        Sentence.validate(conjunct)
-        self.conjuncts.append(conjunct)
+        """Returns a new conjunction with conjunct appended."""
+        return And(*self.conjuncts, conjunct)
 
     def evaluate(self, model):
-        return all(conjunct.evaluate(model) for conjunct in self.conjuncts)
+        for conjunct in self.conjuncts:
+            if not conjunct.evaluate(model):
+                return False
+        return True
+
+    def compile(self, symbol_index):
+        program = []
+        for conjunct in self.conjuncts:
+            program += conjunct.compile(symbol_index)
+        return program + [(AND_N, len(self.conjuncts))]
 
     def formula(self):
-        if len(self.conjuncts) == 1:
-            return self.conjuncts[0].formula()
-        return " ∧ ".join([Sentence.parenthesize(conjunct.formula())
-                           for conjunct in self.conjuncts])
+        if self._formula is None:
+            if len(self.conjuncts) == 1:
+                self._formula = self.conjuncts[0].formula()
+            else:
+                self._formula = " ∧ ".join(
+                    [Sentence.parenthesize(conjunct.formula())
+                     for conjunct in self.conjuncts]
+                )
+        return self._formula
 
     def symbols(self):
-        return set.union(*[conjunct.symbols() for conjunct in self.conjuncts])
+        if self._symbols is None:
+            symbols = set()
+            for conjunct in self.conjuncts:
+                symbols |= conjunct.symbols()
+            self._symbols = frozenset(symbols)
+        return self._symbols
 
 class Implication(Sentence):
+    __slots__ = ("antecedent", "consequent", "_hash", "_formula", "_symbols")
+
     def __init__(self, antecedent, consequent):
         Sentence.validate(antecedent)
         Sentence.validate(consequent)
         self.antecedent = antecedent
         self.consequent = consequent
+        self._hash = hash(("implies", hash(antecedent), hash(consequent)))
+        self._formula = self._symbols = None
 
     def __eq__(self, other):
         return (isinstance(other, Implication)
@@ -136,26 +242,353 @@ class Implication(Sentence):
                 and self.consequent == other.consequent)
 
     def __hash__(self):
-        return hash(("implies", hash(self.antecedent), hash(self.consequent)))
+        return self._hash
+
+    def __reduce__(self):
+        return (self.__class__, (self.antecedent, self.consequent))
 
     def __repr__(self):
         return f"Implication({self.antecedent}, {self.consequent})"
 
     def evaluate(self, model):
-        return ((not self.antecedent.evaluate(model))
-                or self.consequent.evaluate(model))
+        antecedent = self.antecedent.evaluate(model)
+        return not antecedent or self.consequent.evaluate(model)
+
+    def compile(self, symbol_index):
+        return (self.antecedent.compile(symbol_index) + [(NOT,)]
+                + self.consequent.compile(symbol_index) + [(OR_N, 2)])
 
     def formula(self):
-        antecedent = Sentence.parenthesize(self.antecedent.formula())
-        consequent = Sentence.parenthesize(self.consequent.formula())
-        return f"{antecedent} => {consequent}"
+        if self._formula is None:
+            antecedent = Sentence.parenthesize(self.antecedent.formula())
+            consequent = Sentence.parenthesize(self.consequent.formula())
+            self._formula = f"{antecedent} => {consequent}"
+        return self._formula
 
     def symbols(self):
-        return set.union(self.antecedent.symbols(), self.consequent.symbols())
+        if self._symbols is None:
+            self._symbols = (self.antecedent.symbols()
+                             | self.consequent.symbols())
+        return self._symbols
+
+def _run(program, model_bits):
+    """Runs a compiled sentence program against a packed model."""
+    stack = []
+    for op in program:
+        code = op[0]
+        if code == LOAD:
+            stack.append(bool(model_bits & op[1]))
+        elif code == NOT:
+            stack.append(not stack.pop())
+        else:
+            # Slice from an explicit start, since stack[-0:] is the whole stack
+            start = len(stack) - op[1]
+            operands = stack[start:]
+            del stack[start:]
+            stack.append(all(operands) if code == AND_N else any(operands))
+    return stack.pop()
+
+@functools.lru_cache(maxsize=None)
+def _numpy():
+    """Returns the numpy module, or None if it is not installed.
+
+    Imported on first batch call so the integer path never pays for it.
+    """
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+# Smaller batches skip numba: importing it and JIT-compiling the kernel
+# costs far more than broadcasting the masks over a few rows
+_KERNEL_MIN_BATCH = 100_000
+
+@functools.lru_cache(maxsize=None)
+def _eval_kernel():
+    """Returns the numba batch kernel, or None if numba is unavailable."""
+    try:
+        from numba import njit, prange
+    except ImportError:
+        return None
+
+    @njit(parallel=True)
+    def kernel(bits, req, forbid, out):
+        """Fills out[i, j] with whether rule j fires for packed model i."""
+        for i in prange(bits.shape[0]):
+            m = bits[i]
+            for j in range(req.shape[0]):
+                out[i, j] = ((m & req[j]) == req[j]) and ((m & forbid[j]) == 0)
+    return kernel
+
+# Mapping from snake_case scenario keys to CamelCase symbol names
+_KEY_MAPPING = MappingProxyType({
+    'speed_limit': 'SpeedLimit',
+    'residential': 'Residential',
+    'highway': 'Highway',
+    'red_light': 'RedLight',
+    'at_intersection': 'AtIntersection',
+    'vehicle_moving': 'VehicleMoving',
+    'signal_change': 'SignalChange',
+    'signal_used': 'SignalUsed',
+    'one_way': 'OneWay',
+    'wrong_direction': 'WrongDirection',
+    'stop_sign': 'StopSign',
+    'complete_stop': 'CompleteStop',
+    'no_parking': 'NoParking',
+    'is_parked': 'IsParked',
+    'no_overtaking': 'NoOvertaking',
+    'is_overtaking': 'IsOvertaking',
+    'location_a': 'LocationA',
+    'location_b': 'LocationB'
+})
+_SCENARIO_KEYS = tuple(_KEY_MAPPING)
+
+# Bit of each scenario key in the packed model integer
+_BIT_OF_KEY = {key: 1 << i for i, key in enumerate(_SCENARIO_KEYS)}
+_SYM_BIT = {_KEY_MAPPING[key]: bit for key, bit in _BIT_OF_KEY.items()}
+_ALL_BITS = (1 << len(_SCENARIO_KEYS)) - 1
+
+# Public scenario bits; combine with | to describe a scenario as an int,
+# e.g. HIGHWAY | VEHICLE_MOVING | SIGNAL_USED
+(SPEED_LIMIT, RESIDENTIAL, HIGHWAY, RED_LIGHT, AT_INTERSECTION, VEHICLE_MOVING,
+ SIGNAL_CHANGE, SIGNAL_USED, ONE_WAY, WRONG_DIRECTION, STOP_SIGN, COMPLETE_STOP,
+ NO_PARKING, IS_PARKED, NO_OVERTAKING, IS_OVERTAKING, LOCATION_A,
+ LOCATION_B) = _BIT_OF_KEY.values()
+
+def scenario_from_dict(scenario):
+    """Packs a snake_case scenario dict into a scenario bitmask.
+
+    Keys missing from the dict leave their bit unset, i.e. count as False,
+    so every rule can be evaluated against a complete model.
+    """
+    bits = 0
+    for key, bit in _BIT_OF_KEY.items():
+        if scenario.get(key):
+            bits |= bit
+    return bits
+
+# Display label of each scenario key, e.g. 'red_light' -> 'Red Light'
+_UNDERSCORE_TO_SPACE = str.maketrans('_', ' ')
+_CONDITION_LABELS = {
+    key: key.translate(_UNDERSCORE_TO_SPACE).title() for key in _SCENARIO_KEYS
+}
+
+# Shared negations of bare symbols used in the rules
+_NEG = {}
+
+def _n(symbol):
+    """Returns the shared Not(symbol)"""
+    negation = _NEG.get(symbol)
+    if negation is None:
+        negation = _NEG[symbol] = Not(symbol)
+    return negation
+
+def _build_rules():
+    """Build the default traffic rules"""
+    # Define basic propositions
+    speed_limit = Symbol("SpeedLimit")
+    residential = Symbol("Residential")
+    highway = Symbol("Highway")
+    red_light = Symbol("RedLight")
+    at_intersection = Symbol("AtIntersection")
+    vehicle_moving = Symbol("VehicleMoving")
+    signal_change = Symbol("SignalChange")
+    signal_used = Symbol("SignalUsed")
+    one_way = Symbol("OneWay")
+    wrong_direction = Symbol("WrongDirection")
+    stop_sign = Symbol("StopSign")
+    complete_stop = Symbol("CompleteStop")
+    no_parking = Symbol("NoParking")
+    is_parked = Symbol("IsParked")
+    no_overtaking = Symbol("NoOvertaking")
+    is_overtaking = Symbol("IsOvertaking")
+    location_a = Symbol("LocationA")
+    location_b = Symbol("LocationB")
+
+    return (
+        # Speed violations
+        (And(speed_limit, residential), "Speed violation in residential area"),
+        (And(speed_limit, highway), "Speed violation on highway"),
+        
+        # Red light violations
+        (And(red_light, at_intersection, vehicle_moving), "Red light violation"),
+        
+        # Lane change violations
+        (And(signal_change, _n(signal_used)), "Lane change violation"),
+        
+        # One-way violations
+        (And(one_way, wrong_direction), "Wrong way violation"),
+        
+        # Stop sign violations
+        (And(stop_sign, _n(complete_stop)), "Stop sign violation"),
+        
+        # Parking violations
+        (And(no_parking, is_parked), "Parking violation"),
+        
+        # Overtaking violations
+        (And(no_overtaking, is_overtaking), "Overtaking violation"),
+        
+        # Location consistency
+        (And(location_a, location_b), "Location inconsistency")
+    )
+
+def _literal_masks(rule):
+    """Returns (require_mask, forbid_mask) or None if rule is not a
+    conjunction of literals over known symbols"""
+    conjuncts = rule.conjuncts if isinstance(rule, And) else [rule]
+    require_mask = forbid_mask = 0
+    for conjunct in conjuncts:
+        if isinstance(conjunct, Symbol):
+            bit = _SYM_BIT.get(conjunct.name)
+            if bit is None:
+                return None
+            require_mask |= bit
+        elif (isinstance(conjunct, Not)
+              and isinstance(conjunct.operand, Symbol)):
+            bit = _SYM_BIT.get(conjunct.operand.name)
+            if bit is None:
+                return None
+            forbid_mask |= bit
+        else:
+            return None
+    return require_mask, forbid_mask
+
+def _compile_rules(rules):
+    """Compile each rule to a (require_mask, forbid_mask) bit pair
+
+    Rules that are not plain conjunctions of literals, or that mention a
+    symbol without a bit in _SYM_BIT, fall back to a flat opcode program run
+    by _run. Returns (compiled, programs).
+    """
+    compiled = []
+    programs = []
+    for rule, violation_msg in rules:
+        masks = _literal_masks(rule)
+        if masks is None:
+            programs.append((rule.compile(_SYM_BIT), violation_msg))
+        else:
+            compiled.append((*masks, violation_msg))
+    return tuple(compiled), tuple(programs)
+
+class _RuleTables:
+    """Compiled lookup tables for one rule list"""
+
+    def __init__(self, rules):
+        # Snapshot the rules so later in-place edits to the caller's list
+        # show up as a mismatch in TrafficRules._current_tables
+        self.rules = tuple(rules)
+        self.compiled, self.programs = _compile_rules(self.rules)
+
+        # Every rule needs at least one of these bits set, unless some rule
+        # has no required bits at all
+        self.any_req = functools.reduce(
+            operator.or_, (require_mask for require_mask, _, _ in self.compiled), 0
+        )
+        self.unconditional = any(
+            not require_mask for require_mask, _, _ in self.compiled
+        )
+
+        # Parallel tuples for the per-rule loop
+        self.req_arr = tuple(require_mask for require_mask, _, _ in self.compiled)
+        self.forbid_arr = tuple(forbid_mask for _, forbid_mask, _ in self.compiled)
+        self.msgs = tuple(violation_msg for _, _, violation_msg in self.compiled)
+
+        # Every rule also gets its own 32-bit lane in one big int, so a
+        # single pass of integer ops tells whether any rule fires at all
+        self.lane_ones = sum(1 << (i * 32) for i in range(len(self.compiled)))
+        self.lane_high = self.lane_ones << 31
+        self.req_packed = sum(
+            require_mask << (i * 32)
+            for i, require_mask in enumerate(self.req_arr)
+        )
+        self.forbid_packed = sum(
+            forbid_mask << (i * 32)
+            for i, forbid_mask in enumerate(self.forbid_arr)
+        )
+
+        # uint32 copies of the masks, built on the first batch call
+        self.req = self.forbid = None
+
+        # Results depend only on the packed model. Only call this through
+        # TrafficRules.check_violations_bits: it rejects bits outside
+        # _ALL_BITS, which bounds the cache at 2**18 entries
+        self.violations_for_bits = functools.lru_cache(maxsize=None)(
+            self._evaluate_bits
+        )
+
+    def _evaluate_bits(self, model_bits):
+        """Returns the tuple of violations for a packed model"""
+        violations = []
+
+        # A rule's lane is zero when all its required bits are set and no
+        # forbidden one is; only walk the rules if some lane is zero
+        if model_bits & self.any_req or self.unconditional:
+            lanes = model_bits * self.lane_ones
+            misses = (self.req_packed & ~lanes) | (self.forbid_packed & lanes)
+            if ((misses | self.lane_high) - self.lane_ones) & self.lane_high != self.lane_high:
+                violations = [
+                    violation_msg
+                    for require_mask, forbid_mask, violation_msg
+                    in zip(self.req_arr, self.forbid_arr, self.msgs)
+                    if (model_bits & require_mask) == require_mask
+                    and not (model_bits & forbid_mask)
+                ]
+        for program, violation_msg in self.programs:
+            if _run(program, model_bits):
+                violations.append(violation_msg)
+        return tuple(violations)
+
+    def evaluate_batch(self, np, bits):
+        """Returns one list of violations per packed model in a uint32 array"""
+        if self.req is None:
+            self.req = np.array(self.req_arr, dtype=np.uint32)
+            self.forbid = np.array(self.forbid_arr, dtype=np.uint32)
+
+        # (N, num_rules) results; numba runs the rows of large batches in
+        # parallel when available, otherwise broadcast the masks
+        kernel = _eval_kernel() if len(bits) >= _KERNEL_MIN_BATCH else None
+        if kernel is not None:
+            fired = np.empty((len(bits), len(self.req)), dtype=np.bool_)
+            kernel(bits, self.req, self.forbid, fired)
+        else:
+            masked = bits[:, None]
+            fired = (((masked & self.req) == self.req)
+                     & ((masked & self.forbid) == 0))
+
+        results = [[] for _ in range(len(bits))]
+        for i, j in zip(*np.nonzero(fired)):
+            results[i].append(self.msgs[j])
+        if self.programs:
+            for violations, model_bits in zip(results, bits.tolist()):
+                for program, violation_msg in self.programs:
+                    if _run(program, model_bits):
+                        violations.append(violation_msg)
+        return results
+
+# The default rules never change at runtime, so they are built and compiled
+# once here and shared by every TrafficRules instance that keeps them
+_RULES = _build_rules()
+_DEFAULT_TABLES = _RuleTables(_RULES)
+
+def _pack_row(row):
+    """Packs a row of 0/1 values in _SCENARIO_KEYS order into a bitmask"""
+    if isinstance(row, dict):
+        raise TypeError("scenario rows must be sequences; "
+                        "use scenario_from_dict for dicts")
+    if len(row) != len(_SCENARIO_KEYS):
+        raise ValueError(f"scenario row has {len(row)} values, "
+                         f"expected {len(_SCENARIO_KEYS)}")
+    bits = 0
+    for bit, value in zip(_BIT_OF_KEY.values(), row):
+        if value:
+            bits |= bit
+    return bits
 
 class TrafficRules:
     def __init__(self):
-        # Define basic propositions
+        # Define basic propositions; symbols are interned, so these are the
+        # same objects the shared rules are built from
         self.speed_limit = Symbol("SpeedLimit")
         self.residential = Symbol("Residential")
         self.highway = Symbol("Highway")
@@ -178,291 +611,146 @@ class TrafficRules:
         # Define rules and their corresponding violations
         self.rules = []
         self._initialize_rules()
+        self._compile_rules()
 
     def _initialize_rules(self):
         """Initialize all traffic rules"""
-        self.rules = [
-            # Speed violations
-            (And(self.speed_limit, self.residential), "Speed violation in residential area"),
-            (And(self.speed_limit, self.highway), "Speed violation on highway"),
-            
-            # Red light violations
-            (And(self.red_light, self.at_intersection, self.vehicle_moving), "Red light violation"),
-            
-            # Lane change violations
-            (And(self.signal_change, Not(self.signal_used)), "Lane change violation"),
-            
-            # One-way violations
-            (And(self.one_way, self.wrong_direction), "Wrong way violation"),
-            
-            # Stop sign violations
-            (And(self.stop_sign, Not(self.complete_stop)), "Stop sign violation"),
-            
-            # Parking violations
-            (And(self.no_parking, self.is_parked), "Parking violation"),
-            
-            # Overtaking violations
-            (And(self.no_overtaking, self.is_overtaking), "Overtaking violation"),
-            
-            # Location consistency
-            (And(self.location_a, self.location_b), "Location inconsistency")
-        ]
+        self.rules = _RULES
+
+    def _compile_rules(self):
+        """Compile self.rules into lookup tables"""
+        rules = tuple(self.rules)
+        if rules == _RULES:
+            self._tables = _DEFAULT_TABLES
+        else:
+            self._tables = _RuleTables(rules)
+        self._compiled = self._tables.compiled
+
+    def _current_tables(self):
+        """Returns the compiled tables, recompiling if rules has changed"""
+        # tuple() returns the default rules tuple itself, so the usual case
+        # is a single identity check
+        if tuple(self.rules) != self._tables.rules:
+            self._compile_rules()
+        return self._tables
+
+    def check_violations_bits(self, bits):
+        """Returns the violations for a scenario bitmask such as
+        HIGHWAY | VEHICLE_MOVING"""
+        # Coerce NumPy integers to a Python int; the lane test multiplies by
+        # a 288-bit int, which fixed-width integers cannot hold
+        bits = operator.index(bits)
+        if bits & ~_ALL_BITS:
+            raise ValueError(f"scenario bitmask {bits:#x} has unknown bits set")
+        return list(self._current_tables().violations_for_bits(bits))
 
     def check_violations(self, scenario):
-       
-        violations = []
-        
-        # Create mapping from snake_case to CamelCase
-        key_mapping = {
-            'speed_limit': 'SpeedLimit',
-            'residential': 'Residential',
-            'highway': 'Highway',
-            'red_light': 'RedLight',
-            'at_intersection': 'AtIntersection',
-            'vehicle_moving': 'VehicleMoving',
-            'signal_change': 'SignalChange',
-            'signal_used': 'SignalUsed',
-            'one_way': 'OneWay',
-            'wrong_direction': 'WrongDirection',
-            'stop_sign': 'StopSign',
-            'complete_stop': 'CompleteStop',
-            'no_parking': 'NoParking',
-            'is_parked': 'IsParked',
-            'no_overtaking': 'NoOvertaking',
-            'is_overtaking': 'IsOvertaking',
-            'location_a': 'LocationA',
-            'location_b': 'LocationB'
-        }
-        
-        # Convert scenario keys to match symbol names
-        model = {
-            key_mapping[key]: value 
-            for key, value in scenario.items()
-            if key in key_mapping
-        }
-        
-        # Check each rule
-        for rule, violation_msg in self.rules:
-            try:
-                if rule.evaluate(model):
-                    violations.append(violation_msg)
-            except Exception as e:
-                continue  # Skip errors silently for cleaner output
-                
-        return violations
+        """Returns the violations for a snake_case scenario dict"""
+        return self.check_violations_bits(scenario_from_dict(scenario))
+
+    def check_violations_batch(self, scenarios):
+        """Checks many scenarios at once.
+
+        Accepts either a sequence of scenario bitmasks or an
+        (N, num_symbols) 0/1 matrix whose columns follow the order of
+        _SCENARIO_KEYS. Returns one list of violation messages per scenario.
+        """
+        np = _numpy()
+        if np is None:
+            # Without NumPy, check each scenario on the integer path
+            return [
+                self.check_violations_bits(
+                    scenario if isinstance(scenario, int) else _pack_row(scenario)
+                )
+                for scenario in scenarios
+            ]
+
+        scenarios = np.asarray(scenarios)
+        if scenarios.ndim == 2:
+            if scenarios.shape[1] != len(_SCENARIO_KEYS):
+                raise ValueError(f"scenario matrix has {scenarios.shape[1]} "
+                                 f"columns, expected {len(_SCENARIO_KEYS)}")
+            # Pack each row into one integer, one bit per proposition
+            matrix = scenarios.astype(bool)
+            bit_values = np.array(list(_BIT_OF_KEY.values()), dtype=np.uint32)
+            bits = (matrix * bit_values).sum(axis=1, dtype=np.uint32)
+        else:
+            # Compare rather than mask: ~_ALL_BITS is negative, which NumPy
+            # refuses to combine with unsigned arrays
+            if scenarios.size and np.any((scenarios < 0) | (scenarios > _ALL_BITS)):
+                raise ValueError("scenario bitmask has unknown bits set")
+            bits = scenarios.astype(np.uint32)
+        return self._current_tables().evaluate_batch(np, bits)
 
 def main():
     # Initialize traffic rules system
     traffic_system = TrafficRules()
     
-    # Define specific test scenarios, including both violation and non-violation cases
+    # Define specific test scenarios, including both violation and non-violation cases.
+    # Each scenario is a bitmask of its active conditions combined with |
     specific_scenarios = [
         # Non-violation scenarios
         {
             "name": "Normal Highway Driving",
-            "scenario": {
-                'speed_limit': False,  # Not exceeding speed limit
-                'residential': False,
-                'highway': True,
-                'red_light': False,
-                'at_intersection': False,
-                'vehicle_moving': True,
-                'signal_change': False,
-                'signal_used': True,
-                'one_way': False,
-                'wrong_direction': False,
-                'stop_sign': False,
-                'complete_stop': True,
-                'no_parking': False,
-                'is_parked': False,
-                'no_overtaking': False,
-                'is_overtaking': False,
-                'location_a': True,
-                'location_b': False
-            }
+            # Not exceeding speed limit
+            "scenario": HIGHWAY | VEHICLE_MOVING | SIGNAL_USED | COMPLETE_STOP | LOCATION_A
         },
         {
             "name": "Proper Stop at Red Light",
-            "scenario": {
-                'speed_limit': False,
-                'residential': True,
-                'highway': False,
-                'red_light': True,
-                'at_intersection': True,
-                'vehicle_moving': False,  # Stopped at red light
-                'signal_change': False,
-                'signal_used': True,
-                'one_way': False,
-                'wrong_direction': False,
-                'stop_sign': False,
-                'complete_stop': True,
-                'no_parking': False,
-                'is_parked': False,
-                'no_overtaking': False,
-                'is_overtaking': False,
-                'location_a': True,
-                'location_b': False
-            }
+            # Stopped at red light, so VEHICLE_MOVING is not set
+            "scenario": (RESIDENTIAL | RED_LIGHT | AT_INTERSECTION | SIGNAL_USED
+                         | COMPLETE_STOP | LOCATION_A)
         },
         {
             "name": "Legal Parking",
-            "scenario": {
-                'speed_limit': False,
-                'residential': True,
-                'highway': False,
-                'red_light': False,
-                'at_intersection': False,
-                'vehicle_moving': False,
-                'signal_change': False,
-                'signal_used': True,
-                'one_way': False,
-                'wrong_direction': False,
-                'stop_sign': False,
-                'complete_stop': True,
-                'no_parking': False,  # Not a no-parking zone
-                'is_parked': True,    # Parked legally
-                'no_overtaking': False,
-                'is_overtaking': False,
-                'location_a': True,
-                'location_b': False
-            }
+            # Parked legally, not in a no-parking zone
+            "scenario": RESIDENTIAL | SIGNAL_USED | COMPLETE_STOP | IS_PARKED | LOCATION_A
         },
         {
             "name": "Proper Lane Change",
-            "scenario": {
-                'speed_limit': False,
-                'residential': True,
-                'highway': False,
-                'red_light': False,
-                'at_intersection': False,
-                'vehicle_moving': True,
-                'signal_change': True,
-                'signal_used': True,   # Using signal for lane change
-                'one_way': False,
-                'wrong_direction': False,
-                'stop_sign': False,
-                'complete_stop': False,
-                'no_parking': False,
-                'is_parked': False,
-                'no_overtaking': False,
-                'is_overtaking': False,
-                'location_a': True,
-                'location_b': False
-            }
+            # Using signal for lane change
+            "scenario": RESIDENTIAL | VEHICLE_MOVING | SIGNAL_CHANGE | SIGNAL_USED | LOCATION_A
         },
         {
             "name": "Speeding in Residential Area",
-            "scenario": {
-                'speed_limit': True,
-                'residential': True,
-                'highway': False,
-                'red_light': False,
-                'at_intersection': False,
-                'vehicle_moving': True,
-                'signal_change': False,
-                'signal_used': False,
-                'one_way': False,
-                'wrong_direction': False,
-                'stop_sign': False,
-                'complete_stop': False,
-                'no_parking': False,
-                'is_parked': False,
-                'no_overtaking': False,
-                'is_overtaking': False,
-                'location_a': False,
-                'location_b': False
-            }
+            "scenario": SPEED_LIMIT | RESIDENTIAL | VEHICLE_MOVING
         },
         {
             "name": "Running Red Light",
-            "scenario": {
-                'speed_limit': False,
-                'residential': False,
-                'highway': False,
-                'red_light': True,
-                'at_intersection': True,
-                'vehicle_moving': True,
-                'signal_change': False,
-                'signal_used': False,
-                'one_way': False,
-                'wrong_direction': False,
-                'stop_sign': False,
-                'complete_stop': False,
-                'no_parking': False,
-                'is_parked': False,
-                'no_overtaking': False,
-                'is_overtaking': False,
-                'location_a': False,
-                'location_b': False
-            }
+            "scenario": RED_LIGHT | AT_INTERSECTION | VEHICLE_MOVING
         },
         {
             "name": "Illegal Parking and Stop Sign Violation",
-            "scenario": {
-                'speed_limit': False,
-                'residential': False,
-                'highway': False,
-                'red_light': False,
-                'at_intersection': False,
-                'vehicle_moving': False,
-                'signal_change': False,
-                'signal_used': False,
-                'one_way': False,
-                'wrong_direction': False,
-                'stop_sign': True,
-                'complete_stop': False,
-                'no_parking': True,
-                'is_parked': True,
-                'no_overtaking': False,
-                'is_overtaking': False,
-                'location_a': False,
-                'location_b': False
-            }
+            "scenario": STOP_SIGN | NO_PARKING | IS_PARKED
         },
         {
             "name": "Wrong Way on One-Way Street",
-            "scenario": {
-                'speed_limit': False,
-                'residential': False,
-                'highway': False,
-                'red_light': False,
-                'at_intersection': False,
-                'vehicle_moving': True,
-                'signal_change': False,
-                'signal_used': False,
-                'one_way': True,
-                'wrong_direction': True,
-                'stop_sign': False,
-                'complete_stop': False,
-                'no_parking': False,
-                'is_parked': False,
-                'no_overtaking': False,
-                'is_overtaking': False,
-                'location_a': False,
-                'location_b': False
-            }
+            "scenario": VEHICLE_MOVING | ONE_WAY | WRONG_DIRECTION
         }
     ]
 
-    print("Testing specific scenarios:")
+    # Build the whole report first and write it out in one go
+    out = ["Testing specific scenarios:"]
     for scenario_info in specific_scenarios:
-        print(f"\nScenario: {scenario_info['name']}")
-        print("Active conditions:")
-        active_conditions = [key.replace('_', ' ').title() for key, value in scenario_info['scenario'].items() if value]
+        out.append(f"\nScenario: {scenario_info['name']}")
+        out.append("Active conditions:")
+        scenario = scenario_info['scenario']
+        active_conditions = [_CONDITION_LABELS[key] for key, bit in _BIT_OF_KEY.items() if scenario & bit]
         if active_conditions:
             for condition in active_conditions:
-                print(f"- {condition}")
+                out.append(f"- {condition}")
         else:
-            print("- None")
+            out.append("- None")
         
-        violations = traffic_system.check_violations(scenario_info['scenario'])
+        violations = traffic_system.check_violations_bits(scenario)
         if violations:
-            print("\nViolations detected:")
+            out.append("\nViolations detected:")
             for violation in violations:
-                print(f"- {violation}")
+                out.append(f"- {violation}")
         else:
-            print("\nNo violations detected")
-        print("-" * 50)
+            out.append("\nNo violations detected")
+        out.append("-" * 50)
+    sys.stdout.write("\n".join(out) + "\n")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,235 @@
+import importlib.util
+import itertools
+import copy
+import os
+import pickle
+import subprocess
+import sys
+import unittest
+from unittest import mock
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+MODULE_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)),
+    "LogicalInference_TrafficRules_AnneMarie_(S10257168C).py",
+)
+
+
+def load_module(name="traffic_rules"):
+    """Imports the traffic rules script, whose file name is not importable."""
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.spec_from_file_location(name, MODULE_PATH)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+tr = load_module()
+
+
+def models(names):
+    """Yields (model dict, packed bits) for every assignment of names."""
+    for values in itertools.product((False, True), repeat=len(names)):
+        model = dict(zip(names, values))
+        bits = 0
+        for name, value in model.items():
+            if value:
+                bits |= tr._SYM_BIT[name]
+        yield model, bits
+
+
+class CompiledProgramTest(unittest.TestCase):
+    def test_run_matches_evaluate(self):
+        a = tr.Symbol("SpeedLimit")
+        b = tr.Symbol("Residential")
+        c = tr.Symbol("Highway")
+        sentences = [
+            tr.Implication(a, tr.And(b, tr.Not(c))),
+            tr.Not(tr.And(a, b)),
+            tr.And(tr.Implication(a, b), tr.Not(tr.Not(c))),
+            tr.Implication(a, tr.And()),
+            tr.Implication(tr.And(), a),
+            tr.And(tr.And(), tr.Not(tr.And())),
+        ]
+        for sentence in sentences:
+            program = sentence.compile(tr._SYM_BIT)
+            for model, bits in models(["SpeedLimit", "Residential", "Highway"]):
+                with self.subTest(sentence=sentence, model=model):
+                    self.assertEqual(
+                        tr._run(program, bits), sentence.evaluate(model)
+                    )
+
+    def test_empty_and_leaves_stack_alone(self):
+        program = tr.Implication(tr.Symbol("SpeedLimit"), tr.And()).compile(
+            tr._SYM_BIT
+        )
+        self.assertTrue(tr._run(program, tr.SPEED_LIMIT))
+        self.assertTrue(tr._run(program, 0))
+
+
+
+# Pickles a rule in one process so another can load it with a different
+# string hash seed
+PICKLE_SCRIPT = """
+import pickle, sys
+sys.path.insert(0, {test_dir!r})
+from test_traffic_rules import tr
+rule = tr.And(tr.Symbol("SpeedLimit"), tr.Not(tr.Symbol("Highway")))
+sys.stdout.buffer.write(pickle.dumps(
+    (tr.Symbol("SpeedLimit"), tr.Not(tr.Symbol("Highway")), rule,
+     tr.Implication(rule, tr.Symbol("Residential")))
+))
+"""
+
+LOAD_SCRIPT = """
+import pickle, sys
+sys.path.insert(0, {test_dir!r})
+from test_traffic_rules import tr
+symbol, negation, rule, implication = pickle.loads(sys.stdin.buffer.read())
+speed_limit = tr.Symbol("SpeedLimit")
+fresh = tr.And(speed_limit, tr.Not(tr.Symbol("Highway")))
+assert symbol is speed_limit
+assert hash(speed_limit) == hash(("symbol", "SpeedLimit"))
+assert negation is tr.Not(tr.Symbol("Highway"))
+assert hash(rule) == hash(fresh) and rule in {{fresh: 1}}
+assert implication == tr.Implication(fresh, tr.Symbol("Residential"))
+assert hash(implication) == hash(tr.Implication(fresh, tr.Symbol("Residential")))
+"""
+
+
+class InterningTest(unittest.TestCase):
+    def test_copy_returns_interned_instances(self):
+        symbol = tr.Symbol("SpeedLimit")
+        negation = tr.Not(symbol)
+        for node in (symbol, negation):
+            self.assertIs(copy.copy(node), node)
+            self.assertIs(copy.deepcopy(node), node)
+            self.assertIs(pickle.loads(pickle.dumps(node)), node)
+
+    def test_pickle_round_trip_across_hash_seeds(self):
+        test_dir = os.path.dirname(os.path.abspath(__file__))
+
+        def run(script, seed, data=None):
+            env = dict(os.environ, PYTHONHASHSEED=seed)
+            result = subprocess.run(
+                [sys.executable, "-c", script.format(test_dir=test_dir)],
+                input=data, capture_output=True, env=env,
+            )
+            self.assertEqual(result.returncode, 0, result.stderr.decode())
+            return result.stdout
+
+        data = run(PICKLE_SCRIPT, "1")
+        run(LOAD_SCRIPT, "2", data)
+
+
+
+class CheckViolationsBitsTest(unittest.TestCase):
+    def setUp(self):
+        self.traffic = tr.TrafficRules()
+
+    @unittest.skipIf(np is None, "numpy is not installed")
+    def test_accepts_numpy_integers(self):
+        bits = tr.SPEED_LIMIT | tr.RESIDENTIAL
+        expected = ["Speed violation in residential area"]
+        for value in (np.int64(bits), np.array([bits], dtype=np.int64)[0]):
+            self.assertEqual(self.traffic.check_violations_bits(value), expected)
+
+    @unittest.skipIf(np is None, "numpy is not installed")
+    def test_accepts_unsigned_numpy_input(self):
+        bits = tr.SPEED_LIMIT | tr.RESIDENTIAL
+        expected = ["Speed violation in residential area"]
+        self.assertEqual(self.traffic.check_violations_bits(np.uint32(bits)), expected)
+        for dtype in (np.uint32, np.uint64, np.int64):
+            self.assertEqual(
+                self.traffic.check_violations_batch(np.array([bits, 0], dtype=dtype)),
+                [expected, []],
+            )
+
+    def test_rejects_unknown_bits(self):
+        for bad in (tr.SPEED_LIMIT | tr.RESIDENTIAL | (1 << 32), 1 << 18, -1, 1 << 100):
+            with self.assertRaises(ValueError):
+                self.traffic.check_violations_bits(bad)
+            if np is not None and bad < 1 << 63:
+                with self.assertRaises(ValueError):
+                    self.traffic.check_violations_batch([0, bad])
+        if np is not None:
+            with self.assertRaises(ValueError):
+                self.traffic.check_violations_batch(np.array([1 << 18], dtype=np.uint32))
+
+
+
+class ScenarioRowTest(unittest.TestCase):
+    def setUp(self):
+        self.traffic = tr.TrafficRules()
+        self.row = [0] * len(tr._SCENARIO_KEYS)
+        self.row[tr._SCENARIO_KEYS.index("speed_limit")] = 1
+        self.row[tr._SCENARIO_KEYS.index("residential")] = 1
+
+    def test_pack_row(self):
+        self.assertEqual(tr._pack_row(self.row), tr.SPEED_LIMIT | tr.RESIDENTIAL)
+        with self.assertRaises(ValueError):
+            tr._pack_row(self.row[:-1])
+        with self.assertRaises(ValueError):
+            tr._pack_row(self.row + [1])
+        with self.assertRaises(TypeError):
+            tr._pack_row(dict.fromkeys(tr._SCENARIO_KEYS, True))
+
+    def test_batch_rows_without_numpy(self):
+        with mock.patch.object(tr, "_numpy", lambda: None):
+            self.assertEqual(
+                self.traffic.check_violations_batch([self.row]),
+                [["Speed violation in residential area"]],
+            )
+            with self.assertRaises(ValueError):
+                self.traffic.check_violations_batch([self.row[:-1]])
+
+    @unittest.skipIf(np is None, "numpy is not installed")
+    def test_batch_matrix_column_count(self):
+        matrix = np.array([self.row])
+        self.assertEqual(
+            self.traffic.check_violations_batch(matrix),
+            [["Speed violation in residential area"]],
+        )
+        for bad in (matrix[:, :-1], np.hstack([matrix, matrix[:, :1]])):
+            with self.assertRaises(ValueError):
+                self.traffic.check_violations_batch(bad)
+
+
+
+class CustomRulesTest(unittest.TestCase):
+    def setUp(self):
+        self.traffic = tr.TrafficRules()
+        self.traffic.rules = list(self.traffic.rules)
+
+    def check(self, scenario):
+        bits = tr.scenario_from_dict(scenario)
+        violations = self.traffic.check_violations(scenario)
+        self.assertEqual(self.traffic.check_violations_batch([bits]), [violations])
+        return violations
+
+    def test_in_place_append_is_honoured(self):
+        self.assertEqual(self.check({"speed_limit": True}), [])
+        self.traffic.rules.append((tr.And(tr.Symbol("SpeedLimit")), "Custom"))
+        self.assertEqual(self.check({"speed_limit": True}), ["Custom"])
+        self.traffic.rules.pop()
+        self.assertEqual(self.check({"speed_limit": True}), [])
+
+    def test_unknown_symbol_counts_as_false(self):
+        fog = tr.Symbol("Fog")
+        self.traffic.rules.append((tr.And(tr.Symbol("Highway"), tr.Not(fog)), "Clear"))
+        self.traffic.rules.append((tr.And(tr.Symbol("Highway"), fog), "Foggy"))
+        self.assertEqual(self.check({"highway": True}), ["Clear"])
+
+    def test_restoring_default_rules_shares_tables(self):
+        self.traffic.rules = list(tr._RULES)
+        self.assertIs(self.traffic._current_tables(), tr._DEFAULT_TABLES)
+
+
+if __name__ == "__main__":
+    unittest.main()